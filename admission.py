@@ -0,0 +1,170 @@
+"""Admission control in front of the LLM.
+
+A process-wide ``AdmissionController`` caps how many turns call the model at
+once. Excess turns wait in a bounded priority queue (lower number = served
+first) until a slot frees up or their queue-time deadline passes, and each
+user is additionally throttled by a token bucket. Rejected turns raise
+``AdmissionRejected`` carrying a reason and a retry hint, which ``TodoAgent``
+turns into an informative reply instead of an error.
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+from config import (ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_S,
+                    USER_RATE_PER_MINUTE, USER_BURST)
+
+
+class AdmissionRejected(Exception):
+    """A turn was not admitted; ``reason`` is "rate_limited", "queue_full" or "timeout"."""
+
+    def __init__(self, reason: str, retry_after_s: float):
+        super().__init__(f"{reason} (retry after {retry_after_s:.1f}s)")
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate_per_s`` refill up to ``burst`` tokens. Not thread-safe."""
+
+    def __init__(self, rate_per_s: float, burst: int):
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token; return 0 on success or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate_per_s)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate_per_s
+
+    def is_full(self, now: float) -> bool:
+        """True once the bucket has refilled; it is then equivalent to a new one."""
+        return self.tokens + (now - self.updated) * self.rate_per_s >= self.burst
+
+
+class AdmissionController:
+    """Global concurrency limit with a bounded priority queue and per-user rate limits."""
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout_s: float = ADMISSION_QUEUE_TIMEOUT_S,
+                 user_rate_per_minute: Optional[float] = USER_RATE_PER_MINUTE, user_burst: int = USER_BURST):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        # None disables per-user rate limiting (e.g. offline batch replay)
+        self.user_rate_per_s = user_rate_per_minute / 60 if user_rate_per_minute else None
+        self.user_burst = user_burst
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queue = []  # heap of [priority, seq, granted]
+        self._seq = itertools.count()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._last_prune = time.monotonic()
+        # Metrics (guarded by _cond)
+        self._admitted = 0
+        self._rejected: Dict[str, int] = {}
+        self._max_queue_depth = 0
+        self._wait_s = deque(maxlen=1000)
+
+    @contextmanager
+    def admit(self, user_id: str, priority: int = 0, timeout_s: Optional[float] = None):
+        """Hold a model slot for the duration of the ``with`` block."""
+        self._acquire(user_id, priority, self.queue_timeout_s if timeout_s is None else timeout_s)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _reject(self, reason: str, retry_after_s: float):
+        self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        raise AdmissionRejected(reason, retry_after_s)
+
+    def _acquire(self, user_id: str, priority: int, timeout_s: float):
+        start = time.monotonic()
+        with self._cond:
+            if self.user_rate_per_s is not None:
+                self._prune_buckets(start)
+                bucket = self._buckets.get(user_id)
+                if bucket is None:
+                    bucket = self._buckets[user_id] = TokenBucket(self.user_rate_per_s, self.user_burst)
+                wait_for_token = bucket.take()
+                if wait_for_token:
+                    self._reject("rate_limited", wait_for_token)
+
+            if self._active < self.max_concurrent and not self._queue:
+                self._active += 1
+                self._admitted += 1
+                self._wait_s.append(0.0)
+                return
+            if len(self._queue) >= self.max_queue:
+                self._reject("queue_full", self.queue_timeout_s)
+
+            entry = [priority, next(self._seq), False]
+            heapq.heappush(self._queue, entry)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            deadline = start + timeout_s
+            while not entry[2]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._reject("timeout", self.queue_timeout_s)
+                self._cond.wait(remaining)
+            self._admitted += 1
+            self._wait_s.append(time.monotonic() - start)
+
+    def _prune_buckets(self, now: float):
+        """Forget users whose bucket has refilled, so idle sessions don't accumulate.
+
+        Runs at most once per full refill period, which is also how long a
+        bucket must sit idle before it can be dropped.
+        """
+        if now - self._last_prune < self.user_burst / self.user_rate_per_s:
+            return
+        self._last_prune = now
+        self._buckets = {user: bucket for user, bucket in self._buckets.items() if not bucket.is_full(now)}
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            # Hand the freed slot straight to the highest-priority waiter
+            if self._queue and self._active < self.max_concurrent:
+                heapq.heappop(self._queue)[2] = True
+                self._active += 1
+                self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        """Current load plus admission counts and queue wait times."""
+        with self._cond:
+            waits = sorted(self._wait_s)
+            return {
+                "active": self._active,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "admitted": self._admitted,
+                "rejected": dict(self._rejected),
+                "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+            }
+
+
+_default_controller: Optional[AdmissionController] = None
+_default_lock = threading.Lock()
+
+
+def default_controller() -> AdmissionController:
+    """Controller shared by every TodoAgent in this process."""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = AdmissionController()
+        return _default_controller
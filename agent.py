@@ -1,29 +1,68 @@
+import math
 import re
+import time
+import uuid
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
 from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
-from tools import create_todo_tools
+from tools import create_todo_tools, TodoSession
 from memory import PersistentMemory
-from config import GOOGLE_API_KEY, MODEL_NAME, TEMPERATURE, MAX_TOKENS
+from routing import TurnRouter, TierStats
+from admission import AdmissionController, AdmissionRejected, default_controller
+from local_commands import answer_locally
+from config import GOOGLE_API_KEY, MODEL_TIERS, STRONG_TIER
+
+# AgentExecutor's exact outputs when it stops early instead of answering
+_EARLY_STOP_OUTPUTS = {"Agent stopped due to iteration limit or time limit.", "Agent stopped due to max iterations."}
+
+# Tool name AgentExecutor records for an LLM output it could not parse
+_PARSE_ERROR_TOOL = "_Exception"
+
+# Tools whose effects must not be repeated by re-running a turn on another tier
+_MUTATING_TOOLS = {"add_todo", "remove_todo", "clear_todos"}
+
+class TurnFailed(Exception):
+    """No model tier produced a usable answer for a turn."""
+
+def gemini_llm(tier_config: dict):
+    """Build the Gemini chat model for one tier of ``MODEL_TIERS``."""
+    return ChatGoogleGenerativeAI(
+        google_api_key=GOOGLE_API_KEY,
+        model=tier_config["model"],
+        temperature=tier_config["temperature"],
+        max_output_tokens=tier_config["max_tokens"]
+    )
 
 class TodoAgent:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            google_api_key=GOOGLE_API_KEY,
-            model=MODEL_NAME,
-            temperature=TEMPERATURE,
-            max_tokens=MAX_TOKENS
-        )
-        self.memory = PersistentMemory()
-        self.tools = create_todo_tools()
+    def __init__(self, memory: PersistentMemory = None, llm_factory=gemini_llm, tiers: dict = MODEL_TIERS,
+                 todos: TodoSession = None, admission: AdmissionController = None, session_id: str = None):
+        self.memory = memory if memory is not None else PersistentMemory()
+        self.todos = todos if todos is not None else TodoSession()
+        self.admission = admission if admission is not None else default_controller()
+        # Rate limits apply per session (browser tab, CLI run, batch session), not per
+        # todo namespace, which several sessions may share
+        self.session_id = session_id or uuid.uuid4().hex
+        self.tools = create_todo_tools(self.todos)
+        self.llm_factory = llm_factory
+        self.router = TurnRouter(tiers)
+        self.tier_stats = TierStats()
+        self._executors = {}
         
-        # Bind tools to LLM
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
-        self.agent_executor = self._create_agent()
+        # Build the strong tier up front so configuration errors surface at startup;
+        # other tiers are built on first use
+        self.agent_executor = self._executor_for(STRONG_TIER)
+
+    def _executor_for(self, tier: str) -> AgentExecutor:
+        """Return the (cached) agent executor for a model tier"""
+        if tier not in self._executors:
+            llm = self.llm_factory(self.router.tiers[tier])
+            # Bind tools to LLM
+            self._executors[tier] = self._create_agent(llm.bind_tools(self.tools))
+        return self._executors[tier]
 
-    def _create_agent(self):
+    def _create_agent(self, llm_with_tools):
         """Create agent with better prompt and tool handling"""
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are TodoBot, a helpful assistant that manages conversations and to-do lists.
@@ -39,6 +78,7 @@ CONTEXT:
 
 When the user asks about todos, ALWAYS use the list_todos tool first to get current state.
 When adding/removing todos, use the appropriate tools and confirm the action.
+The user can keep several named lists; use show_lists and switch_list when they refer to a different list.
 Be conversational and natural in your responses."""),
             MessagesPlaceholder(variable_name="chat_history"),
             ("user", "{input}"),
@@ -56,7 +96,7 @@ Be conversational and natural in your responses."""),
                 "chat_history": lambda x: x.get("chat_history", []),
             }
             | prompt
-            | self.llm_with_tools
+            | llm_with_tools
             | OpenAIToolsAgentOutputParser()
         )
         
@@ -65,6 +105,7 @@ Be conversational and natural in your responses."""),
             tools=self.tools,
             verbose=True,
             handle_parsing_errors=True,
+            return_intermediate_steps=True,
             max_iterations=3,
             early_stopping_method="generate"
         )
@@ -84,42 +125,116 @@ Be conversational and natural in your responses."""),
                 return match.group(1).capitalize()
         return None
 
-    def chat(self, user_input: str) -> str:
-        """Main chat method with improved error handling"""
+    def chat(self, user_input: str, priority: int = 0, raise_on_failure: bool = False) -> str:
+        """Main chat method with improved error handling
+
+        ``priority`` orders turns waiting for a model slot (lower is served first).
+        With ``raise_on_failure`` a shed turn raises ``AdmissionRejected`` and a
+        failed one ``TurnFailed`` instead of returning a busy or apology reply.
+        """
         # Extract and store name if provided
         name = self._extract_name(user_input)
         if name and not self.memory.get_user_name():
             self.memory.set_user_name(name)
 
-        # Add to memory
-        self.memory.add_message(user_input, is_human=True)
-        
-        # Get context
-        context = self.memory.get_context()
+        # Simple todo commands are answered locally: no model call, no admission limits
+        answer = answer_locally(user_input, self.todos)
+        if answer is not None:
+            self.memory.add_message(user_input, is_human=True)
+            self.memory.add_message(answer, is_human=False)
+            return answer
+
+        try:
+            with self.admission.admit(self.session_id, priority):
+                return self._chat_with_model(user_input, raise_on_failure)
+        except AdmissionRejected as e:
+            if raise_on_failure:
+                raise
+            return self._busy_reply(e)
+
+    def _chat_with_model(self, user_input: str, raise_on_failure: bool = False) -> str:
+        """Run one turn through the routed model tier(s) and record it in memory
+
+        The turn is saved only once it has an answer, so a turn that raises
+        ``TurnFailed`` leaves no trace and can be retried as if it never ran.
+        """
+        # Get context, including this turn's message
+        context = self.memory.get_context(pending=user_input)
         
         # Prepare inputs
         inputs = {
             "input": user_input,
             "context": context,
-            "chat_history": self.memory.memory.chat_memory.messages[-4:],  # Last 4 messages
+            "chat_history": self.memory.get_chat_history(4, pending=user_input),  # Last 4 messages
         }
 
-        try:
-            # Get response from agent
-            response = self.agent_executor.invoke(inputs)
-            answer = response.get("output", "Sorry, I couldn't process that.")
-            
-            # Clean up response
-            answer = self._clean_response(answer)
-            
-        except Exception as e:
-            print(f"Agent error: {e}")
+        route = self.router.route(user_input)
+        answer, tool_results = self._run_tier(route.tier, inputs, can_escalate=route.tier != STRONG_TIER)
+        if answer is None and tool_results:
+            # The turn already changed todos; re-running it would apply the change twice,
+            # so report what the tools did instead of escalating
+            answer = "\n".join(tool_results)
+        elif answer is None and route.tier != STRONG_TIER:
+            # Parse failure or unusable answer on the fast tier: retry on the strong one
+            answer, _ = self._run_tier(self.router.escalate(route).tier, inputs, can_escalate=False)
+        if answer is None:
+            if raise_on_failure:
+                raise TurnFailed("no model tier produced a usable answer")
             answer = "I apologize, but I encountered an error. Please try again."
 
-        # Add response to memory
+        # Add the turn to memory
+        self.memory.add_message(user_input, is_human=True)
         self.memory.add_message(answer, is_human=False)
         return answer
 
+    def _busy_reply(self, rejected: AdmissionRejected) -> str:
+        """Explain a turn that was shed by admission control"""
+        wait_s = max(1, math.ceil(rejected.retry_after_s))
+        if rejected.reason == "rate_limited":
+            return (f"⏳ You're sending messages faster than I can keep up with. "
+                    f"Please wait about {wait_s} seconds and try again.")
+        return (f"⏳ I'm handling a lot of requests right now and couldn't get to that one. "
+                f"Please try again in about {wait_s} seconds. Simple commands like "
+                f"'show my todos' still work right away.")
+
+    def _run_tier(self, tier: str, inputs: dict, can_escalate: bool):
+        """Run one turn on ``tier``
+
+        Returns ``(answer, tool_results)``: the cleaned answer or None if it failed,
+        and the outputs of tools that changed todos during the run.
+        """
+        start = time.perf_counter()
+        answer = None
+        tool_results = []
+        writes_before = self.todos.writes
+        try:
+            # Get response from agent
+            response = self._executor_for(tier).invoke(inputs)
+            steps = response.get("intermediate_steps", [])
+            tool_results = [str(observation) for action, observation in steps if action.tool in _MUTATING_TOOLS]
+            output = response.get("output", "")
+            # A run that ended on an unparsable model output failed even if some text came back
+            ended_on_parse_error = bool(steps) and steps[-1][0].tool == _PARSE_ERROR_TOOL
+            if output and output.strip() not in _EARLY_STOP_OUTPUTS and not ended_on_parse_error:
+                # Clean up response
+                answer = self._clean_response(output) or None
+        except Exception as e:
+            print(f"Agent error ({tier} tier): {e}")
+        if not tool_results and self.todos.writes != writes_before:
+            # The run failed after a tool had already written todos
+            tool_results = ["I've updated your to-do list, but couldn't finish my reply."]
+        escalated = answer is None and can_escalate and not tool_results
+        self.tier_stats.record(tier, time.perf_counter() - start, escalated=escalated)
+        return answer, tool_results
+
+    def get_routing_stats(self) -> dict:
+        """Per-tier call counts, latency and escalation rates"""
+        return self.tier_stats.summary()
+
+    def get_admission_metrics(self) -> dict:
+        """Queue depth, wait times and shed turns of the shared admission controller"""
+        return self.admission.metrics()
+
     def _clean_response(self, response: str) -> str:
         """Clean up agent response"""
         # Remove any remaining agent scratchpad artifacts
@@ -0,0 +1,259 @@
+"""Offline batch mode: replay a JSONL file of chat requests through TodoAgent.
+
+Input records look like ``{"session_id": "alice", "message": "Add milk to my list"}``
+(``user_id`` is accepted in place of ``session_id``; an optional ``id`` is echoed
+back); records without either are rejected. Session ids are normalized like todo
+shard names, so ids differing only in case are one session. Batch sessions keep
+their conversations and todos (as user ``batch-<session>``) under their own data
+directory, never in the live CLI/web data. Messages from the same session are processed strictly
+in input order, while different sessions run concurrently on a bounded thread
+pool so their LLM waits overlap.
+
+Each result is appended to the output JSONL as soon as it finishes, together
+with its per-record latency. The output file doubles as the checkpoint: when a
+run is restarted, input lines already answered in the output are skipped, while
+lines written with an ``error`` (model failure, shed turn) are retried. Once a
+turn of a session fails, the session's later lines are written as errors
+("blocked by line N") instead of running, so a restart replays them in order.
+
+Usage:
+    python main.py batch INPUT.jsonl OUTPUT.jsonl [--workers N] [--data-dir DIR]
+"""
+import argparse
+import functools
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+from config import SESSIONS_DIR, BATCH_WORKERS, BATCH_MAX_PENDING, BATCH_PRIORITY
+from tools import shard_name
+
+
+def default_agent_factory(session_id: str, admission, store, data_dir: str = SESSIONS_DIR):
+    """Build a TodoAgent with its own conversation file and todo namespace under ``data_dir``."""
+    from agent import TodoAgent
+    from memory import PersistentMemory
+    from tools import TodoSession
+
+    os.makedirs(data_dir, exist_ok=True)
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+    return TodoAgent(memory=PersistentMemory(os.path.join(data_dir, f"{safe_id}.json")),
+                     todos=TodoSession(f"batch-{session_id}", store),
+                     admission=admission, session_id=f"batch-{session_id}")
+
+
+def session_key(record: dict) -> Optional[str]:
+    """Normalized session of a record (one agent and todo shard per key), or None."""
+    session_id = record.get("session_id") or record.get("user_id")
+    return shard_name(str(session_id)) if session_id else None
+
+
+def record_error(record: dict) -> Optional[str]:
+    """Why a record cannot be processed at all, or None if it is valid."""
+    if "_error" in record:
+        return record["_error"]
+    if session_key(record) is None:
+        return "record has no 'session_id' or 'user_id'"
+    if not isinstance(record.get("message"), str) or not record["message"].strip():
+        return "record has no 'message'"
+    return None
+
+
+def read_records(input_path: str) -> Iterator[Tuple[int, dict]]:
+    """Stream ``(line_number, record)`` pairs from a JSONL file, skipping blank lines."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, {"_error": f"invalid JSON: {e}"}
+
+
+def load_checkpoint(output_path: str) -> Set[int]:
+    """Return input line numbers already answered successfully in the output file."""
+    done = set()
+    try:
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                    if "error" not in result:
+                        done.add(result["line"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue  # torn last line from an interrupted run
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _open_output(output_path: str):
+    """Open the output for appending, making sure we start on a fresh line."""
+    needs_newline = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    out = open(output_path, "a", encoding="utf-8")
+    if needs_newline:
+        out.write("\n")
+    return out
+
+
+class BatchRunner:
+    """Run records through per-session agents with bounded concurrency."""
+
+    def __init__(self, agent_factory: Optional[Callable[[str], object]] = None,
+                 workers: int = BATCH_WORKERS, max_pending: int = BATCH_MAX_PENDING,
+                 data_dir: str = SESSIONS_DIR):
+        if agent_factory is None:
+            # The worker pool already bounds concurrency, and replayed traffic
+            # must not be shed by the interactive per-user rate limits
+            from admission import AdmissionController
+            from tools import TodoStore
+            admission = AdmissionController(max_concurrent=workers, user_rate_per_minute=None)
+            agent_factory = functools.partial(default_agent_factory, admission=admission,
+                                              store=TodoStore(os.path.join(data_dir, "todos")),
+                                              data_dir=data_dir)
+        self.agent_factory = agent_factory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.agents: Dict[str, object] = {}
+
+    def _process(self, line_no: int, record: dict) -> dict:
+        """Handle one valid record; runs on a worker thread."""
+        session_id = session_key(record)
+        result = {"line": line_no, "id": record.get("id"), "session_id": session_id}
+        start = time.perf_counter()
+        try:
+            agent = self.agents.get(session_id)
+            if agent is None:
+                # Only one worker touches a session at a time, so no lock is needed
+                agent = self.agents[session_id] = self.agent_factory(session_id)
+            # Batch turns yield to interactive ones if they share a controller; failed
+            # or shed turns raise so they are written as errors and retried next run
+            result["response"] = agent.chat(record["message"], priority=BATCH_PRIORITY, raise_on_failure=True)
+        except Exception as e:
+            result["error"] = str(e)
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    def run(self, input_path: str, output_path: str) -> dict:
+        """Process ``input_path`` into ``output_path`` and return run statistics."""
+        done = load_checkpoint(output_path)
+        stats = {"processed": 0, "skipped": 0, "errors": 0}
+        queues: Dict[str, deque] = {}  # session -> records not yet submitted
+        ready: deque = deque()  # sessions with queued records and nothing running
+        blocked: Dict[str, int] = {}  # session -> line of its turn that failed in this run
+        buffered = 0
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool, _open_output(output_path) as out:
+            running = {}  # future -> session_id
+
+            def fill():
+                # At most `workers` records are ever in the pool, so an interrupt
+                # only has to wait for the ones already calling the model
+                while ready and len(running) < self.workers:
+                    session_id = ready.popleft()
+                    running[pool.submit(self._process, *queues[session_id].popleft())] = session_id
+
+            def emit(result):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["processed"] += 1
+                stats["errors"] += "error" in result
+
+            def block(session_id, line_no, record):
+                emit({"line": line_no, "id": record.get("id"), "session_id": session_id,
+                      "error": f"blocked by line {blocked[session_id]}", "latency_ms": 0.0})
+
+            def write(future):
+                nonlocal buffered
+                session_id = running.pop(future)
+                result = future.result()
+                emit(result)
+                buffered -= 1
+                if "error" in result:
+                    # Later turns must not overtake the failed one; they are
+                    # retried after it on the next run
+                    blocked[session_id] = result["line"]
+                    while queues[session_id]:
+                        block(session_id, *queues[session_id].popleft())
+                        buffered -= 1
+                if queues[session_id]:
+                    ready.append(session_id)
+                else:
+                    del queues[session_id]
+                    # The conversation is on disk; drop the agent (LLM clients, memory
+                    # subscribed to the event bus) and rebuild it if the session returns
+                    self.agents.pop(session_id, None)
+
+            def drain(block: bool):
+                finished, _ = wait(list(running), timeout=None if block else 0,
+                                   return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future)
+                fill()
+
+            try:
+                for line_no, record in read_records(input_path):
+                    if line_no in done:
+                        stats["skipped"] += 1
+                        continue
+                    error = record_error(record)
+                    if error is not None:
+                        # Invalid records fail on their own without blocking a session
+                        emit({"line": line_no, "id": record.get("id"), "session_id": session_key(record),
+                              "error": error, "latency_ms": 0.0})
+                        continue
+                    session_id = session_key(record)
+                    if session_id in blocked:
+                        block(session_id, line_no, record)
+                        continue
+                    buffered += 1
+                    if session_id in queues:
+                        queues[session_id].append((line_no, record))
+                    else:
+                        queues[session_id] = deque([(line_no, record)])
+                        ready.append(session_id)
+                        fill()
+                    if buffered >= self.max_pending:
+                        drain(block=True)
+                    elif running:
+                        drain(block=False)
+
+                while running:
+                    drain(block=True)
+            finally:
+                # On Ctrl-C, keep the results of records already in flight; the
+                # unsubmitted ones are picked up from the checkpoint next run
+                if running:
+                    wait(list(running))
+                    for future in list(running):
+                        write(future)
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed_s"] = round(elapsed, 2)
+        stats["throughput_per_s"] = round(stats["processed"] / elapsed, 2) if elapsed else 0.0
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Process chat requests from a JSONL file.")
+    parser.add_argument("input", help="input JSONL with session_id/user_id and message per line")
+    parser.add_argument("output", help="output JSONL; also used as the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="concurrent sessions")
+    parser.add_argument("--data-dir", default=SESSIONS_DIR,
+                        help="where batch conversations, todos and change events are kept")
+    args = parser.parse_args(argv)
+
+    stats = BatchRunner(workers=args.workers, data_dir=args.data_dir).run(args.input, args.output)
+    print(f"✅ Batch finished: {stats['processed']} processed, {stats['skipped']} skipped "
+          f"(already done), {stats['errors']} errors in {stats['elapsed_s']}s "
+          f"({stats['throughput_per_s']} records/s)")
@@ -0,0 +1,90 @@
+"""Load-test admission control against a local stub model.
+
+Many simulated users fire turns at once through TodoAgent; the stub model
+answers after a fixed delay. Reports how many turns were admitted or shed,
+queue depth and queue wait times, and checks that local fast-path commands
+are never limited.
+
+    python benchmarks/bench_admission.py [users] [turns_per_user] [latency_ms]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from admission import AdmissionController
+from agent import TodoAgent
+from memory import PersistentMemory
+from tools import TodoSession, TodoStore
+
+
+def stub_llm_factory(latency_s):
+    class StubLLM:
+        def __init__(self, tier_config):
+            pass
+
+        def bind_tools(self, tools):
+            return RunnableLambda(self._respond)
+
+        def _respond(self, prompt):
+            time.sleep(latency_s)
+            return AIMessage(content="ok")
+
+    return StubLLM
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    latency_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 100) / 1000
+
+    controller = AdmissionController(max_concurrent=4, max_queue=16, queue_timeout_s=1.0,
+                                     user_rate_per_minute=60, user_burst=5)
+    replies = {"model": 0, "model_shed": 0, "local": 0, "local_shed": 0}
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TodoStore(os.path.join(tmp, "todos"))
+        agents = [
+            TodoAgent(memory=PersistentMemory(os.path.join(tmp, f"conv{u}.json")),
+                      llm_factory=stub_llm_factory(latency_s),
+                      todos=TodoSession(f"user{u}", store), admission=controller)
+            for u in range(users)
+        ]
+
+        def user_loop(agent):
+            for i in range(turns):
+                local = i % 4 == 3
+                message = "show my todos" if local else f"tell me something interesting #{i}"
+                reply = agent.chat(message)
+                shed = reply.startswith("⏳")
+                with lock:
+                    key = "local" if local else "model"
+                    replies[key + "_shed" if shed else key] += 1
+
+        threads = [threading.Thread(target=user_loop, args=(agent,)) for agent in agents]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # AgentExecutor is verbose
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        elapsed = time.perf_counter() - start
+
+    print(f"Admission load test: {users} users x {turns} turns, {latency_s * 1000:.0f} ms stub latency, "
+          f"max_concurrent={controller.max_concurrent}, max_queue={controller.max_queue}")
+    print(f"  elapsed {elapsed:.2f}s")
+    print(f"  model turns answered {replies['model']}, shed {replies['model_shed']}")
+    print(f"  local fast-path turns answered {replies['local']}, shed {replies['local_shed']}")
+    print(f"  metrics {controller.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare batch throughput at different worker counts using a stub model.
+
+The stub sleeps to simulate LLM latency, so the numbers show how well batch
+mode overlaps waits across sessions without spending API quota:
+
+    python benchmarks/bench_batch.py [records] [sessions] [latency_ms]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import BatchRunner
+
+
+class StubAgent:
+    def __init__(self, session_id: str, latency_s: float):
+        self.latency_s = latency_s
+
+    def chat(self, message: str, priority: int = 0, raise_on_failure: bool = False) -> str:
+        time.sleep(self.latency_s)
+        return f"ok: {message}"
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    latency_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "in.jsonl")
+        with open(input_path, "w") as f:
+            for i in range(records):
+                f.write(json.dumps({"session_id": f"s{i % sessions}", "message": f"msg {i}"}) + "\n")
+
+        print(f"Batch benchmark: {records} records, {sessions} sessions, {latency_s * 1000:.0f} ms stub latency")
+        for workers in (1, 4, 8, 16):
+            output_path = os.path.join(tmp, f"out-{workers}.jsonl")
+            runner = BatchRunner(lambda sid: StubAgent(sid, latency_s), workers=workers)
+            stats = runner.run(input_path, output_path)
+            with open(output_path) as f:
+                latencies = sorted(json.loads(line)["latency_ms"] for line in f)
+            p50 = latencies[len(latencies) // 2]
+            print(f"workers={workers:3d}  {stats['throughput_per_s']:8.1f} records/s"
+                  f"  elapsed {stats['elapsed_s']:6.2f}s  p50 latency {p50:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Measure cross-process change notification latency and the reloads it avoids.
+
+A child process adds todos and conversation messages in a temporary data
+directory. This process keeps the same shard cached and the same
+conversation open, and records how long each change event took to arrive
+and whether applying it avoided re-reading the file.
+
+    python benchmarks/bench_events.py [changes] [interval_ms]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory import PersistentMemory
+from tools import TodoSession, TodoStore
+
+WRITER = """
+import sys, time
+sys.path.insert(0, {root!r})
+from memory import PersistentMemory
+from tools import TodoSession, TodoStore
+session = TodoSession(store=TodoStore({todos_root!r}))
+memory = PersistentMemory({conv_file!r})
+for i in range({changes}):
+    session.add_todo(f"task {{i}}")
+    memory.add_message(f"message {{i}}")
+    time.sleep({interval_s})
+"""
+
+
+def main():
+    changes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    interval_s = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todos_root = os.path.join(tmp, "todos")
+        conv_file = os.path.join(tmp, "conversation.json")
+        store = TodoStore(todos_root)
+        session = TodoSession(store=store)
+        session.save_todos([])
+        session.load_todos()  # cache the shard we want kept fresh
+        memory = PersistentMemory(conv_file)
+
+        latencies = []
+        done = threading.Event()
+
+        def on_todo_change(event):
+            latencies.append(time.time() - event.published_at)
+            if len(latencies) == changes:
+                done.set()
+
+        store.bus.subscribe("todos", on_todo_change)
+        reads_before = store.disk_reads
+
+        code = WRITER.format(root=ROOT, todos_root=todos_root, conv_file=conv_file,
+                             changes=changes, interval_s=interval_s)
+        subprocess.run([sys.executable, "-c", code], check=True)
+        done.wait(timeout=5)
+        time.sleep(store.bus.poll_interval_s * 2)  # let memory events land too
+
+        todos = session.load_todos()
+        print(f"Change notification benchmark: {changes} remote changes, {interval_s * 1000:.0f} ms apart, "
+              f"poll interval {store.bus.poll_interval_s * 1000:.0f} ms")
+        if latencies:
+            ms = sorted(x * 1000 for x in latencies)
+            print(f"  notification latency: median {statistics.median(ms):.1f} ms, "
+                  f"p95 {ms[min(len(ms) - 1, int(len(ms) * 0.95))]:.1f} ms, max {ms[-1]:.1f} ms")
+        print(f"  todo events received {len(latencies)}, shard re-reads {store.disk_reads - reads_before} "
+              f"(without events: one per change; final list has {len(todos)} items)")
+        print(f"  conversation messages synced {len(memory.transcript)}/{changes}, full reloads {memory.reloads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare conversation memory footprint and per-turn CPU before/after the compact transcript.
+
+"legacy" reproduces the previous PersistentMemory, which kept every turn as a
+LangChain message inside ConversationBufferMemory; "compact" is the current
+Transcript-backed PersistentMemory. Both persist to a temporary file.
+
+    python benchmarks/bench_memory.py [history_messages] [turns]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory import PersistentMemory
+
+
+class LegacyMemory:
+    """The pre-Transcript implementation, kept here only as a baseline."""
+
+    def __init__(self, conversation_file):
+        from langchain.memory import ConversationBufferMemory
+        self.conversation_file = conversation_file
+        self.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+        self.user_name = None
+        with open(conversation_file) as f:
+            data = json.load(f)
+        self.user_name = data.get("user_name")
+        for m in data.get("conversations", []):
+            if m["type"] == "human":
+                self.memory.chat_memory.add_user_message(m["content"])
+            else:
+                self.memory.chat_memory.add_ai_message(m["content"])
+
+    def save_memory(self):
+        from langchain.schema import HumanMessage
+        conv = [{"type": "human" if isinstance(m, HumanMessage) else "ai", "content": m.content}
+                for m in self.memory.chat_memory.messages]
+        json.dump({"user_name": self.user_name, "conversations": conv}, open(self.conversation_file, "w"), indent=2)
+
+    def add_message(self, message, is_human=True):
+        if is_human:
+            self.memory.chat_memory.add_user_message(message)
+        else:
+            self.memory.chat_memory.add_ai_message(message)
+        self.save_memory()
+
+    def get_context(self):
+        from langchain.schema import HumanMessage
+        context = f"The user's name is {self.user_name}. " if self.user_name else ""
+        for m in self.memory.chat_memory.messages[-6:]:
+            prefix = "User" if isinstance(m, HumanMessage) else "Assistant"
+            context += f"\n{prefix}: {m.content}"
+        return context
+
+    def get_chat_history(self, n):
+        return self.memory.chat_memory.messages[-n:]
+
+
+def write_history(path, messages):
+    conv = [{"type": "human" if i % 2 == 0 else "ai",
+             "content": f"message number {i}: please add task {i} to my list"} for i in range(messages)]
+    with open(path, "w") as f:
+        json.dump({"user_name": "Bench", "conversations": conv}, f)
+
+
+def measure(label, factory, path, messages, turns):
+    # Warm imports so they are not counted as per-message memory
+    factory(path)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    mem = factory(path)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    start = time.perf_counter()
+    for i in range(turns):
+        mem.add_message(f"turn {i}", is_human=True)
+        mem.get_context()
+        mem.get_chat_history(4)
+        mem.add_message(f"reply {i}", is_human=False)
+    per_turn = (time.perf_counter() - start) / turns
+    print(f"{label:8s} {held / messages:8.0f} B/message  {per_turn * 1000:8.2f} ms/turn")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"Memory benchmark: {messages} stored messages, {turns} turns")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory in (("legacy", LegacyMemory), ("compact", PersistentMemory)):
+            path = os.path.join(tmp, f"{label}.json")
+            write_history(path, messages)
+            measure(label, factory, path, messages, turns)
+
+
+if __name__ == "__main__":
+    main()
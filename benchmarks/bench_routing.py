@@ -0,0 +1,120 @@
+"""Check the model-tier routing policy offline with stub models.
+
+Prints the tier chosen for a labelled sample of messages, then runs them
+through TodoAgent with stub LLMs (fixed latency per tier; the fast stub fails
+on a few messages to exercise escalation) and reports per-tier latency and escalation rates.
+Finally checks that a fast-tier failure after a todo-changing tool call is
+not escalated, so the change is applied only once.
+
+    python benchmarks/bench_routing.py
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from admission import AdmissionController
+from agent import TodoAgent
+from memory import PersistentMemory
+from routing import TurnRouter
+from tools import TodoSession, TodoStore
+
+# (message, tier a sensible policy should pick)
+SAMPLES = [
+    ("hi", "fast"),
+    ("My name is Sarah", "fast"),
+    ("thanks!", "fast"),
+    ("Show my todos", "fast"),
+    ("Add buy milk to my list", "fast"),
+    ("Remove 2 from my list", "fast"),
+    ("Add milk and eggs to my list, then show me the list", "strong"),
+    ("Remove the dentist task and add call mom to my todos", "strong"),
+    ("Can you help me plan my week around my current tasks and suggest priorities?", "strong"),
+    ("What's the capital of Australia?", "strong"),
+    ("Clear my todo list", "fast"),
+    ("I have a lot going on at work this week, my manager wants the report by Friday, "
+     "and I also need to organise a birthday party, can you help me break this down?", "strong"),
+    ("hey there!", "fast"),
+    ("thanks a lot", "fast"),
+    # Requests that merely start like smalltalk
+    ("great now write me a 500 word essay on the french revolution", "strong"),
+    ("hey can you explain how compound interest works", "strong"),
+    ("ok so what is the derivative of x squared times sin x", "strong"),
+    ("I am trying to figure out how to refinance my mortgage with a variable rate loan", "strong"),
+]
+
+LATENCY_S = {"fast": 0.02, "strong": 0.08}
+FAST_TIER_FAILS = {"Remove 2 from my list", "thanks!"}
+DELETE_FIRST = "please delete the first item from my list"
+
+
+class StubLLM:
+    """Minimal stand-in for a chat model: answers after a fixed delay."""
+
+    def __init__(self, tier_config):
+        self.tier = "fast" if tier_config["max_tokens"] < 1000 else "strong"
+
+    def bind_tools(self, tools):
+        return RunnableLambda(self._respond)
+
+    def _respond(self, prompt):
+        time.sleep(LATENCY_S[self.tier])
+        messages = prompt.to_messages()
+        text = messages[-1].content
+        if any(m.content == DELETE_FIRST for m in messages):
+            if not isinstance(messages[-1], ToolMessage):
+                return AIMessage(content="", tool_calls=[
+                    {"name": "remove_todo", "args": {"task_or_index": "1"}, "id": f"{self.tier}-1"}])
+            # Tool already ran: the fast stub then fails to produce a reply
+            return AIMessage(content="" if self.tier == "fast" else "Removed it.")
+        if self.tier == "fast" and text in FAST_TIER_FAILS:
+            return AIMessage(content="")  # simulate a fast-tier failure
+        return AIMessage(content=f"[{self.tier}] ok")
+
+
+def main():
+    router = TurnRouter()
+    correct = 0
+    print("Routing decisions:")
+    for message, expected in SAMPLES:
+        route = router.route(message)
+        correct += route.tier == expected
+        flag = "" if route.tier == expected else f"  (expected {expected})"
+        print(f"  {route.tier:6s} {route.intent:10s} tools={route.expected_tool_calls} "
+              f"conf={route.confidence:.1f}  {message[:50]!r}{flag}")
+    print(f"Policy agreement: {correct}/{len(SAMPLES)}")
+    assert correct == len(SAMPLES), "routing policy disagrees with the labelled samples"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        agent = TodoAgent(memory=PersistentMemory(os.path.join(tmp, "conv.json")), llm_factory=StubLLM,
+                          todos=TodoSession(store=TodoStore(os.path.join(tmp, "todos"))),
+                          admission=AdmissionController(user_rate_per_minute=None))
+        with contextlib.redirect_stdout(io.StringIO()):  # AgentExecutor is verbose
+            for message, _ in SAMPLES:
+                agent.chat(message)
+    # Simple todo commands are answered locally and never reach a model tier
+    print("\nPer-tier stats (stub models):")
+    for tier, stats in agent.get_routing_stats().items():
+        print(f"  {tier:6s} {stats}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        todos = TodoSession(store=TodoStore(os.path.join(tmp, "todos")))
+        todos.save_todos(["a", "b", "c"])
+        agent = TodoAgent(memory=PersistentMemory(os.path.join(tmp, "conv.json")), llm_factory=StubLLM,
+                          todos=todos, admission=AdmissionController(user_rate_per_minute=None))
+        assert agent.router.route(DELETE_FIRST).tier == "fast"
+        with contextlib.redirect_stdout(io.StringIO()):
+            reply = agent.chat(DELETE_FIRST)
+        remaining = todos.load_todos()
+    print(f"\nFast-tier failure after a tool call: {remaining} (reply {reply!r})")
+    assert remaining == ["b", "c"], f"todo change applied more than once: {remaining}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure CLI cold-start cost: import time of the entry modules and agent warm-up.
+
+Each measurement runs in a fresh interpreter so module caches don't hide the
+real cost. The agent is built on a temporary todo store and conversation file,
+so the real ``data/`` directory is left alone. Run from the repo root:
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    "import main (banner ready)": "import main",
+    "import local_commands (fast path ready)": "import local_commands",
+    "import agent": "import agent",
+    "TodoAgent() (warm-up)": (
+        "from agent import TodoAgent; from memory import PersistentMemory; from tools import TodoSession, TodoStore\n"
+        "TodoAgent(memory=PersistentMemory({tmp!r} + '/conversation.json'),"
+        " todos=TodoSession(store=TodoStore({tmp!r} + '/todos')))"
+    ),
+}
+
+
+def time_snippet(code: str) -> float:
+    """Return seconds spent in ``code`` inside a fresh interpreter."""
+    script = (
+        "import time; _t = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - _t)"
+    )
+    env = dict(os.environ, GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY") or "bench")
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Startup benchmark ({runs} runs each, fresh interpreter)")
+    for label, code in SNIPPETS.items():
+        try:
+            samples = []
+            for _ in range(runs):
+                with tempfile.TemporaryDirectory() as tmp:
+                    samples.append(time_snippet(code.format(tmp=tmp)))
+        except subprocess.CalledProcessError as e:
+            print(f"{label:42s} failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{label:42s} median {statistics.median(samples) * 1000:8.1f} ms"
+              f"  min {min(samples) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare per-operation cost of one global todos file vs per-user shards.
+
+"global" reads and rewrites a single document holding every user's todos,
+as the old data/todos.json store did; "sharded" uses TodoStore, which only
+touches the acting user's list.
+
+    python benchmarks/bench_todos.py [users] [todos_per_user] [ops]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import TodoStore, TodoSession
+
+
+def bench_global(path, users, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        with open(path) as f:
+            data = json.load(f)
+        data[f"user{i % users}"].append(f"new task {i}")
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    return (time.perf_counter() - start) / ops
+
+
+def bench_sharded(root, users, ops):
+    store = TodoStore(root)
+    sessions = [TodoSession(f"user{u}", store) for u in range(users)]
+    start = time.perf_counter()
+    for i in range(ops):
+        sessions[i % users].add_todo(f"new task {i}")
+    return (time.perf_counter() - start) / ops
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    ops = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    print(f"Todo storage benchmark: {users} users x {per_user} todos, {ops} add operations")
+    with tempfile.TemporaryDirectory() as tmp:
+        data = {f"user{u}": [f"task {u}-{t}" for t in range(per_user)] for u in range(users)}
+        global_path = os.path.join(tmp, "todos.json")
+        with open(global_path, "w") as f:
+            json.dump(data, f, indent=2)
+        store = TodoStore(os.path.join(tmp, "shards"))
+        for user, todos in data.items():
+            store.save(user, "todos", todos)
+
+        print(f"global   {bench_global(global_path, users, ops) * 1000:8.3f} ms/op")
+        print(f"sharded  {bench_sharded(store.root, users, ops) * 1000:8.3f} ms/op")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,46 @@ load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 # File paths
-TODOS_FILE = "data/todos.json"
+TODOS_FILE = "data/todos.json"  # legacy single-file store, migrated into TODOS_DIR
+TODOS_DIR = "data/todos"  # one shard per user and list: data/todos/<user>/<list>.json
 CONVERSATION_FILE = "data/conversation_history.json"
+SESSIONS_DIR = "data/sessions"  # batch mode data: per-session conversations, todos/ and their event log
 
 # Model settings
 MODEL_NAME = "gemini-2.0-flash"  # Updated from "gemini-pro"
 TEMPERATURE = 0.7
 MAX_TOKENS = 1000
 
+# Model tiers: simple turns go to "fast", complex or failed ones to "strong"
+MODEL_TIERS = {
+    "fast": {"model": "gemini-2.0-flash-lite", "temperature": TEMPERATURE, "max_tokens": 400},
+    "strong": {"model": MODEL_NAME, "temperature": TEMPERATURE, "max_tokens": MAX_TOKENS},
+}
+STRONG_TIER = "strong"
+ROUTER_MIN_CONFIDENCE = 0.6  # below this the router sends the turn to the strong tier
+ROUTER_FAST_MAX_WORDS = 25  # longer inputs always go to the strong tier
+
+# Admission control (model calls only; local fast paths are never limited)
+ADMISSION_MAX_CONCURRENT = 4  # turns calling the model at once, per process
+ADMISSION_MAX_QUEUE = 32  # turns allowed to wait for a slot
+ADMISSION_QUEUE_TIMEOUT_S = 20  # give up waiting after this long
+USER_RATE_PER_MINUTE = 20  # sustained model turns per user
+USER_BURST = 5
+
+# Todo storage
+DEFAULT_USER = "default"
+DEFAULT_LIST = "todos"
+TODO_SHARD_CACHE_SIZE = 64  # shards kept in memory (LRU)
+
+# Change notifications (events.py)
+EVENTS_POLL_INTERVAL_S = 0.1  # how often other processes' events are picked up
+EVENTS_LOG_MAX_BYTES = 1_000_000  # rotate the shared event log beyond this size
+
 # Agent settings
 AGENT_NAME = "Agentic bot"
 AGENT_DESCRIPTION = "A helpful assistant that manages conversations and to-do lists"
+
+# Batch mode settings
+BATCH_WORKERS = 4  # concurrent sessions (overlapping LLM waits)
+BATCH_MAX_PENDING = 256  # input records buffered ahead of the workers
+BATCH_PRIORITY = 10  # admission priority of batch turns (interactive turns use 0)
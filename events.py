@@ -0,0 +1,162 @@
+"""Change notifications for todo and memory writes, in-process and across processes.
+
+Writers publish a ``ChangeEvent`` carrying a version and a delta. Subscribers
+in the same process are called synchronously; other processes sharing the
+data directory receive it through an append-only JSONL log (``.events.jsonl``
+next to the data) that a daemon thread tails. Subscribers apply the delta to
+their caches instead of reloading whole files.
+
+One bus exists per data directory (see ``bus_for``), so temporary stores in
+benchmarks never write into the real ``data/`` log.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Optional
+from config import EVENTS_POLL_INTERVAL_S, EVENTS_LOG_MAX_BYTES
+
+# Identifies events published by this process in the shared log
+PROCESS_TOKEN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class ChangeEvent(NamedTuple):
+    topic: str  # "todos" or "memory"
+    key: str  # what changed: "<user>/<list>" or a conversation file
+    version: int  # version of ``key`` after the change (shard mtime_ns, conversation write seq)
+    delta: dict  # topic-specific change description
+    source: str  # PROCESS_TOKEN of the publisher
+    published_at: float  # time.time() at publish, for latency measurements
+
+
+class EventBus:
+    """Publish/subscribe bus backed by an append-only event log for other processes."""
+
+    def __init__(self, log_path: str, poll_interval_s: float = EVENTS_POLL_INTERVAL_S,
+                 max_log_bytes: int = EVENTS_LOG_MAX_BYTES):
+        self.log_path = log_path
+        self.poll_interval_s = poll_interval_s
+        self.max_log_bytes = max_log_bytes
+        self._subscribers: Dict[str, List[Callable]] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watch_from = (None, 0)  # (inode, offset) of the log when watching started
+        self.published = 0
+        self.received_remote = 0
+
+    def subscribe(self, topic: str, callback: Callable[[ChangeEvent], None]):
+        """Call ``callback(event)`` for every event on ``topic``.
+
+        Bound methods are held weakly so subscribing does not keep the
+        owner (a store or memory object) alive.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(ref)
+        self._start_watcher()
+
+    def publish(self, topic: str, key: str, version: int, delta: dict) -> ChangeEvent:
+        """Deliver an event to local subscribers and append it to the shared log."""
+        event = ChangeEvent(topic, key, version, delta, PROCESS_TOKEN, time.time())
+        self.published += 1
+        self._dispatch(event)
+        self._append(event)
+        return event
+
+    def _dispatch(self, event: ChangeEvent):
+        with self._lock:
+            refs = list(self._subscribers.get(event.topic, []))
+        dead = []
+        for ref in refs:
+            callback = ref()
+            if callback is None:
+                dead.append(ref)
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Event subscriber error ({event.topic}): {e}")
+        if dead:
+            with self._lock:
+                self._subscribers[event.topic] = [r for r in self._subscribers[event.topic] if r not in dead]
+
+    def _append(self, event: ChangeEvent):
+        line = json.dumps(event._asdict(), ensure_ascii=False) + "\n"
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.max_log_bytes:
+                # Readers notice the new inode and switch over after finishing the old file
+                os.replace(self.log_path, self.log_path + ".1")
+            # A single O_APPEND write keeps lines from different processes intact
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"Could not write change event: {e}")
+
+    def _start_watcher(self):
+        with self._lock:
+            if self._watcher is not None:
+                return
+            try:
+                st = os.stat(self.log_path)
+                self._watch_from = (st.st_ino, st.st_size)
+            except FileNotFoundError:
+                pass
+            self._watcher = threading.Thread(target=self._watch, name="event-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        """Tail the log and dispatch events published by other processes."""
+        f, inode = None, None
+        while True:
+            try:
+                st = os.stat(self.log_path)
+                if f is None or st.st_ino != inode:
+                    if f is not None:
+                        self._drain(f)  # finish the rotated file first
+                        f.close()
+                    f, inode = open(self.log_path, "r", encoding="utf-8"), st.st_ino
+                    if inode == self._watch_from[0]:
+                        f.seek(self._watch_from[1])  # only events since we subscribed
+                self._drain(f)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Event watcher error: {e}")
+            time.sleep(self.poll_interval_s)
+
+    def _drain(self, f):
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                return
+            if not line.endswith("\n"):
+                f.seek(pos)  # partially written line; retry on the next poll
+                return
+            try:
+                event = ChangeEvent(**json.loads(line))
+            except (json.JSONDecodeError, TypeError):
+                continue
+            if event.source != PROCESS_TOKEN:
+                self.received_remote += 1
+                self._dispatch(event)
+
+
+_buses: Dict[str, EventBus] = {}
+_buses_lock = threading.Lock()
+
+
+def bus_for(data_dir: str) -> EventBus:
+    """Return the bus shared by everything stored under ``data_dir``."""
+    data_dir = os.path.abspath(data_dir or ".")
+    with _buses_lock:
+        bus = _buses.get(data_dir)
+        if bus is None:
+            bus = _buses[data_dir] = EventBus(os.path.join(data_dir, ".events.jsonl"))
+        return bus
@@ -0,0 +1,69 @@
+"""Answer simple todo commands locally, without calling the LLM.
+
+Only unambiguous phrasings are matched: a single task (no "and", commas or
+ordinal words) and removal by exact index or exact name. Anything else
+returns None and goes to the agent as usual. This module must stay cheap to import (no LangChain)
+so the CLI can serve these commands before the agent has finished warming up.
+"""
+import re
+from typing import Optional
+from tools import TodoSession, default_session
+
+_LIST_NAMES = r"(?:todos?|to-dos?|todo list|to-do list|list)"
+
+_LIST = re.compile(
+    rf"^(?:(?:show|list|display|view)(?: me)?(?: all)? my {_LIST_NAMES}"
+    rf"|what'?s on my {_LIST_NAMES}|what is on my {_LIST_NAMES})\W*$",
+    re.IGNORECASE,
+)
+_ADD = re.compile(
+    rf"^add ['\"]?(?P<task>.+?)['\"]? to my {_LIST_NAMES}\W*$",
+    re.IGNORECASE,
+)
+_REMOVE = re.compile(
+    rf"^(?:remove|delete) ['\"]?(?P<task>.+?)['\"]? from my {_LIST_NAMES}\W*$",
+    re.IGNORECASE,
+)
+# Tasks that may be several tasks or refer to a position ("the first one")
+_AMBIGUOUS_TASK = re.compile(
+    r"\b(?:and|then|also|first|second|third|fourth|fifth|last|next|previous|\d+(?:st|nd|rd|th))\b|[,;&+]",
+    re.IGNORECASE,
+)
+_CLEAR = re.compile(rf"^clear my {_LIST_NAMES}\W*$", re.IGNORECASE)
+_SHOW_LISTS = re.compile(r"^(?:show|list|display|view)(?: me)?(?: all)? my lists\W*$", re.IGNORECASE)
+_SWITCH = re.compile(
+    r"^(?:switch|change|go) to (?:my |the )?['\"]?(?P<name>[\w -]+?)['\"]? list\W*$",
+    re.IGNORECASE,
+)
+
+
+def answer_locally(message: str, todos: Optional[TodoSession] = None) -> Optional[str]:
+    """Return a tool response for a simple todo command, or None if the LLM is needed"""
+    todos = todos if todos is not None else default_session()
+    message = message.strip()
+    if _LIST.match(message):
+        return todos.list_todos()
+    if _CLEAR.match(message):
+        return todos.clear_todos()
+    if _SHOW_LISTS.match(message):
+        return todos.show_lists()
+    match = _SWITCH.match(message)
+    if match:
+        return todos.switch_list(match.group("name"))
+    match = _ADD.match(message)
+    if match and not _AMBIGUOUS_TASK.search(match.group("task")):
+        return todos.add_todo(match.group("task"))
+    match = _REMOVE.match(message)
+    if match and _is_exact_task(match.group("task"), todos):
+        return todos.remove_todo(match.group("task"))
+    return None
+
+
+def _is_exact_task(task: str, todos: TodoSession) -> bool:
+    """True if ``task`` is a list index or exactly names an existing task"""
+    task = task.strip()
+    if task.isdigit():
+        return True
+    if _AMBIGUOUS_TASK.search(task):
+        return False
+    return any(existing.lower() == task.lower() for existing in todos.load_todos())
@@ -1,7 +1,81 @@
 import sys
-import os
-from agent import TodoAgent
+import threading
 from config import GOOGLE_API_KEY
+from local_commands import answer_locally
+from memory import read_user_name
+from tools import default_session
+
+# `agent` (LangChain, langchain_google_genai, pydantic) is imported lazily so
+# the banner and first prompt appear without waiting for those imports.
+
+
+class AgentWarmup:
+    """Build the TodoAgent in a background thread while the user types."""
+
+    def __init__(self):
+        self._agent = None
+        self._error = None
+        self._pending = []
+        self._thread = threading.Thread(target=self._build, name="agent-warmup", daemon=True)
+
+    def _build(self):
+        try:
+            from agent import TodoAgent
+            # Share the todo session the local fast paths use (active list)
+            self._agent = TodoAgent(todos=default_session())
+        except Exception as e:
+            self._error = e
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def ready(self) -> bool:
+        return not self._thread.is_alive()
+
+    def defer(self, action):
+        """Queue ``action(agent)`` to run once warm-up has finished."""
+        self._pending.append(action)
+
+    def get(self):
+        """Wait for warm-up, replay deferred actions and return the agent.
+
+        Only a failure to build the agent is raised; failed replays are reported.
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        self._replay()
+        return self._agent
+
+    def _replay(self):
+        while self._pending:
+            action = self._pending.pop(0)
+            try:
+                action(self._agent)
+            except Exception as e:
+                print(f"\n⚠️ Could not save a turn answered during start-up: {e}")
+
+    def close(self):
+        """Replay deferred actions before exiting, whichever way the CLI exits."""
+        if not self._pending:
+            return
+        self._thread.join()
+        if self._error is not None:
+            print(f"⚠️ {len(self._pending)} action(s) from start-up were not saved: "
+                  f"the agent failed to initialize ({self._error})")
+            self._pending.clear()
+            return
+        self._replay()
+
+
+def _record_turn(user_input: str, response: str):
+    """Deferred action that stores a locally answered turn in the agent's memory."""
+    def record(agent):
+        agent.memory.add_message(user_input, is_human=True)
+        agent.memory.add_message(response, is_human=False)
+    return record
+
 
 def run_cli():
     """Run the CLI version of the chatbot."""
@@ -14,25 +88,27 @@ def run_cli():
     print("Type 'help' for available commands.")
     print("=" * 50)
     
-    # Initialize agent
-    try:
-        agent = TodoAgent()
-        print(f"✅ Agent initialized successfully!")
-        
-        # Check if user has a name
-        user_name = agent.get_user_name()
-        if user_name:
-            print(f"👋 Welcome back, {user_name}!")
-        else:
-            print("👋 Hello! What's your name?")
-            
-    except Exception as e:
-        print(f"❌ Error initializing agent: {e}")
-        print("Please check your .env file and make sure GOOGLE_API_KEY is set.")
-        return
+    # Initialize agent in the background; simple commands don't need it
+    warmup = AgentWarmup().start()
+
+    user_name = read_user_name()
+    if user_name:
+        print(f"👋 Welcome back, {user_name}!")
+    else:
+        print("👋 Hello! What's your name?")
     
     print("\n" + "=" * 50)
     
+    try:
+        _chat_loop(warmup)
+    finally:
+        # Flush clears/turns that were served before warm-up finished
+        warmup.close()
+
+
+def _chat_loop(warmup: AgentWarmup):
+    """Read and answer user input until the user quits."""
+    agent = None
     while True:
         try:
             # Get user input
@@ -44,15 +120,35 @@ def run_cli():
                 break
             
             elif user_input.lower() == 'clear':
-                response = agent.clear_conversation()
+                if agent is not None:
+                    response = agent.clear_conversation()
+                else:
+                    warmup.defer(lambda a: a.clear_conversation())
+                    response = "Conversation cleared! How can I help you today?"
                 print(f"🤖 TodoBot: {response}")
                 continue
             
+            elif user_input.lower() == 'stats':
+                stats = agent.get_routing_stats() if agent is not None else {}
+                if not stats:
+                    print("📊 No turns have gone to the model yet.")
+                for tier, tier_stats in stats.items():
+                    print(f"📊 {tier}: {tier_stats['calls']} calls, "
+                          f"avg {tier_stats['avg_latency_ms']} ms, max {tier_stats['max_latency_ms']} ms, "
+                          f"escalation rate {tier_stats['escalation_rate']:.0%}")
+                if agent is not None:
+                    admission = agent.get_admission_metrics()
+                    print(f"🚦 admission: {admission['active']} active, {admission['queue_depth']} queued "
+                          f"(max {admission['max_queue_depth']}), wait avg {admission['wait_ms_avg']} ms / "
+                          f"p95 {admission['wait_ms_p95']} ms, shed {admission['rejected'] or 'none'}")
+                continue
+            
             elif user_input.lower() == 'help':
                 print("\n📋 Available Commands:")
                 print("• 'quit', 'exit', 'bye' - Exit the chat")
                 print("• 'clear' - Clear conversation history")
                 print("• 'help' - Show this help message")
+                print("• 'stats' - Show model tier and admission (queue/wait) stats")
                 print("\n📝 Todo Commands (just type naturally):")
                 print("• 'Add [task] to my todo list'")
                 print("• 'Show my todos' or 'List my todos'")
@@ -64,12 +160,28 @@ def run_cli():
                 print("🤖 TodoBot: Please say something!")
                 continue
             
-            # Get response from agent
+            # Serve simple todo commands locally while the agent is still warming up
+            if agent is None and not warmup.ready():
+                response = answer_locally(user_input)
+                if response is not None:
+                    warmup.defer(_record_turn(user_input, response))
+                    print(f"🤖 TodoBot: {response}")
+                    continue
+            
             print("🤖 TodoBot: ", end="", flush=True)
+            if agent is None:
+                try:
+                    agent = warmup.get()
+                except Exception as e:
+                    print(f"\n❌ Error initializing agent: {e}")
+                    print("Please check your .env file and make sure GOOGLE_API_KEY is set.")
+                    return
+            
+            # Get response from agent
             response = agent.chat(user_input)
             print(response)
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print("\n\n👋 Goodbye! Have a great day!")
             break
         except Exception as e:
@@ -79,6 +191,8 @@ def run_cli():
 def run_streamlit():
     """Run the Streamlit web interface."""
     import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from agent import TodoAgent
     
     st.set_page_config(
         page_title="TodoBot",
@@ -92,7 +206,7 @@ def run_streamlit():
     # Initialize agent
     if 'agent' not in st.session_state:
         try:
-            st.session_state.agent = TodoAgent()
+            st.session_state.agent = TodoAgent(session_id=get_script_run_ctx().session_id)
             st.success("✅ Agent initialized successfully!")
         except Exception as e:
             st.error(f"❌ Error initializing agent: {e}")
@@ -178,6 +292,10 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1] == "web":
         print("🌐 Starting Streamlit web interface...")
         run_streamlit()
+    elif len(sys.argv) > 1 and sys.argv[1] == "batch":
+        import batch
+        print("📦 Starting batch processing...")
+        batch.main(sys.argv[2:])
     else:
         print("🖥️  Starting CLI interface...")
         run_cli()
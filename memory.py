@@ -1,53 +1,203 @@
 import json
-from typing import Optional, Dict, Any, List
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import HumanMessage, AIMessage
+import os
+import threading
+import uuid
+from array import array
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+from json.encoder import encode_basestring_ascii as _encode_str
+from events import ChangeEvent, bus_for
+from locks import file_lock
 from config import CONVERSATION_FILE
 
-class PersistentMemory:
+# Role codes stored in Transcript; the strings are the on-disk "type" values
+HUMAN, AI = 0, 1
+_ROLE_TYPES = ("human", "ai")
+
+def read_user_name() -> Optional[str]:
+    """Read the stored user name without loading the conversation or LangChain."""
+    try:
+        with open(CONVERSATION_FILE, 'r') as f:
+            return json.load(f).get('user_name')
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+class Transcript:
+    """Compact append-only message log.
+
+    Roles live in a byte array and message text in one contiguous UTF-8 buffer
+    indexed by an offsets array, so each message costs ~9 bytes plus its text
+    instead of a LangChain message object.
+    """
+    __slots__ = ("_roles", "_offsets", "_text")
+
     def __init__(self):
-        self.memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+        self._roles = array('B')
+        self._offsets = array('Q', [0])
+        self._text = bytearray()
+
+    def append(self, role: int, content: str):
+        self._text += content.encode('utf-8')
+        self._roles.append(role)
+        self._offsets.append(len(self._text))
+
+    def clear(self):
+        self._roles = array('B')
+        self._offsets = array('Q', [0])
+        self._text = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._roles)
+
+    def content(self, i: int) -> str:
+        return self._text[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        for i in range(len(self._roles)):
+            yield self._roles[i], self.content(i)
+
+    def tail(self, n: int) -> List[Tuple[int, str]]:
+        """Return the last ``n`` messages as ``(role, content)`` pairs."""
+        start = max(len(self._roles) - n, 0)
+        return [(self._roles[i], self.content(i)) for i in range(start, len(self._roles))]
+
+def _dump_conversation(user_name: Optional[str], transcript: Transcript, seq: int = 0,
+                       writer: Optional[str] = None) -> str:
+    """Serialize like ``json.dumps(..., indent=2)`` without the slow pure-Python indent encoder."""
+    items = [f'    {{\n      "type": "{_ROLE_TYPES[role]}",\n      "content": {_encode_str(content)}\n    }}'
+             for role, content in transcript]
+    conv = "[\n" + ",\n".join(items) + "\n  ]" if items else "[]"
+    return (f'{{\n  "user_name": {json.dumps(user_name)},\n  "seq": {seq},\n  "writer": {json.dumps(writer)},'
+            f'\n  "conversations": {conv}\n}}')
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class PersistentMemory:
+    def __init__(self, conversation_file: str = CONVERSATION_FILE):
+        self.conversation_file = conversation_file
+        self.transcript = Transcript()
         self.user_name: Optional[str] = None
+        # Every write bumps ``seq`` (stored in the file); ``last_writer`` made the latest one
+        self.seq = 0
+        self.last_writer: Optional[str] = None
+        self.reloads = 0
+        self._writer = uuid.uuid4().hex[:12]
+        self._stamp: Optional[Tuple[int, int]] = None  # file (mtime_ns, size) as last read or written
+        self._lock = threading.RLock()
         self.load_memory()
+        # Other sessions on the same conversation file publish their changes here
+        self._key = os.path.abspath(conversation_file)
+        self.bus = bus_for(os.path.dirname(self._key))
+        self.bus.subscribe("memory", self._on_change)
 
     def load_memory(self):
         try:
-            with open(CONVERSATION_FILE, 'r') as f:
+            with open(self.conversation_file, 'r') as f:
                 data = json.load(f)
+                st = os.fstat(f.fileno())
+                self._stamp = st.st_mtime_ns, st.st_size
                 self.user_name = data.get('user_name')
+                self.seq = data.get('seq', 0)
+                self.last_writer = data.get('writer')
                 for m in data.get("conversations", []):
                     if m["type"] == "human":
-                        self.memory.chat_memory.add_user_message(m["content"])
+                        self.transcript.append(HUMAN, m["content"])
                     elif m["type"] == "ai":
-                        self.memory.chat_memory.add_ai_message(m["content"])
+                        self.transcript.append(AI, m["content"])
         except FileNotFoundError:
             pass
 
     def save_memory(self):
-        conv = []
-        for m in self.memory.chat_memory.messages:
-            role = "human" if isinstance(m, HumanMessage) else "ai"
-            conv.append({"type": role, "content": m.content})
-        json.dump({"user_name": self.user_name, "conversations": conv}, open(CONVERSATION_FILE, "w"), indent=2)
+        data = _dump_conversation(self.user_name, self.transcript, self.seq, self.last_writer)
+        tmp = f"{self.conversation_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, self.conversation_file)
+        self._stamp = _file_stamp(self.conversation_file)
 
     def add_message(self, message: str, is_human=True):
-        if is_human:
-            self.memory.chat_memory.add_user_message(message)
-        else:
-            self.memory.chat_memory.add_ai_message(message)
-        self.save_memory()
+        role = HUMAN if is_human else AI
+        self._write({"op": "append", "role": _ROLE_TYPES[role], "content": message})
+
+    def _write(self, delta: dict):
+        """Apply ``delta`` on top of the latest file contents, save and publish it.
+
+        The file lock serializes writers across sessions and processes; anyone
+        whose copy is stale re-reads the file first, so no message is dropped.
+        """
+        with file_lock(self.conversation_file):
+            with self._lock:
+                if self._stamp != _file_stamp(self.conversation_file):
+                    self._reload()
+                self._apply(delta)
+                self.seq += 1
+                self.last_writer = self._writer
+                self.save_memory()
+                version = self.seq
+            # Still under the file lock so the event log is in write order
+            self.bus.publish("memory", self._key, version, dict(delta, writer=self._writer))
 
-    def get_context(self):
+    def _apply(self, delta: dict):
+        if delta["op"] == "append":
+            self.transcript.append(_ROLE_TYPES.index(delta["role"]), delta["content"])
+        elif delta["op"] == "clear":
+            self.transcript.clear()
+            self.user_name = None
+        elif delta["op"] == "user_name":
+            self.user_name = delta["name"]
+
+    def _on_change(self, event: ChangeEvent):
+        """Apply a change made by another session to this conversation file"""
+        if event.key != self._key:
+            return
+        writer = event.delta.get("writer")
+        with self._lock:
+            if event.version == self.seq + 1:
+                self._apply(event.delta)
+                self.seq, self.last_writer = event.version, writer
+            elif event.version > self.seq or (event.version == self.seq and writer != self.last_writer):
+                # We missed something, or another writer produced a different
+                # change at the same version; fall back to the file
+                self._reload()
+
+    def _reload(self):
+        self.transcript = Transcript()
+        self.user_name = None
+        self.seq, self.last_writer, self._stamp = 0, None, None
+        self.load_memory()
+        self.reloads += 1
+
+    def _tail(self, n: int, pending: Optional[str]) -> List[Tuple[int, str]]:
+        if pending is None:
+            return self.transcript.tail(n)
+        return (self.transcript.tail(n - 1) if n > 1 else []) + [(HUMAN, pending)]
+
+    def get_context(self, pending: Optional[str] = None):
+        """``pending`` is a user message of the current turn that is not saved yet."""
         context = f"The user's name is {self.user_name}. " if self.user_name else ""
-        messages = self.memory.chat_memory.messages[-6:]
-        for m in messages:
-            prefix = "User" if isinstance(m, HumanMessage) else "Assistant"
-            context += f"\n{prefix}: {m.content}"
+        for role, content in self._tail(6, pending):
+            prefix = "User" if role == HUMAN else "Assistant"
+            context += f"\n{prefix}: {content}"
         return context
 
-    def set_user_name(self, name: str): self.user_name = name; self.save_memory()
+    def get_chat_history(self, n: int, pending: Optional[str] = None) -> List[Any]:
+        """Materialize the last ``n`` messages as LangChain messages for the prompt."""
+        from langchain_core.messages import HumanMessage, AIMessage
+        return [HumanMessage(content=content) if role == HUMAN else AIMessage(content=content)
+                for role, content in self._tail(n, pending)]
+
+    def set_user_name(self, name: str):
+        self._write({"op": "user_name", "name": name})
+
     def get_user_name(self) -> Optional[str]: return self.user_name
-    def clear_memory(self): self.memory.clear(); self.user_name = None; self.save_memory()
+
+    def clear_memory(self):
+        self._write({"op": "clear"})
+
     def get_full_history(self) -> List[Dict[str, str]]:
-        return [{"role": "user" if isinstance(m, HumanMessage) else "assistant", "content": m.content}
-                for m in self.memory.chat_memory.messages]
+        return [{"role": "user" if role == HUMAN else "assistant", "content": content}
+                for role, content in self.transcript]
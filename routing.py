@@ -0,0 +1,105 @@
+"""Per-turn model tier routing.
+
+The router looks only at cheap local features of the user message (length,
+detected intent and how many tool calls it is likely to need) and picks a
+tier from ``config.MODEL_TIERS``. ``TodoAgent`` escalates to the strong tier
+when the chosen tier fails or produces an unusable answer.
+"""
+import re
+import threading
+from typing import Dict, NamedTuple
+from config import MODEL_TIERS, STRONG_TIER, ROUTER_MIN_CONFIDENCE, ROUTER_FAST_MAX_WORDS
+
+# Only short messages: a greeting or acknowledgement plus at most two words, or an
+# introduction on its own. Longer text starting with "ok"/"hey"/"I am" is a real request.
+_SMALLTALK = re.compile(
+    r"^(?:(?:hi|hello|hey|yo|thanks|thank you|thx|ok|okay|cool|great|bye|good (?:morning|afternoon|evening|night)"
+    r"|how are you)(?:[\s,]+[\w']+){0,2}"
+    r"|(?:my name is|i am|i'm|call me) \w+)[\s!.,?]*$",
+    re.IGNORECASE,
+)
+_TODO_ACTIONS = re.compile(
+    r"\b(?:add|remove|delete|clear|show|display|put|mark|finish)\b"
+    r"|(?<!my )(?<!the )(?<!todo )(?<!to-do )\blist\b",  # "list" the verb, not "my list"
+    re.IGNORECASE,
+)
+_TODO_NOUNS = re.compile(r"\b(?:todos?|to-dos?|list|tasks?)\b", re.IGNORECASE)
+_MULTI_STEP = re.compile(r"\b(?:and then|then|after that|also|and)\b|[,;]", re.IGNORECASE)
+
+
+class TurnRoute(NamedTuple):
+    tier: str
+    max_tokens: int
+    intent: str  # "smalltalk", "todo", "todo_multi" or "open"
+    expected_tool_calls: int
+    confidence: float
+
+
+def classify(message: str):
+    """Return ``(intent, expected_tool_calls, confidence)`` for a user message."""
+    text = message.strip()
+    actions = len(_TODO_ACTIONS.findall(text))
+    mentions_list = bool(_TODO_NOUNS.search(text))
+    if _SMALLTALK.match(text) and not mentions_list:
+        return "smalltalk", 0, 0.9
+    if actions and mentions_list:
+        if actions == 1 and not _MULTI_STEP.search(text):
+            return "todo", 1, 0.9
+        return "todo_multi", actions, 0.7
+    if actions or mentions_list:
+        return "todo", 1, 0.5  # probably about todos, but phrased loosely
+    return "open", 0, 0.4
+
+
+class TurnRouter:
+    """Pick a model tier and output-token cap for each turn."""
+
+    def __init__(self, tiers: Dict[str, dict] = MODEL_TIERS, min_confidence: float = ROUTER_MIN_CONFIDENCE,
+                 fast_max_words: int = ROUTER_FAST_MAX_WORDS):
+        self.tiers = tiers
+        self.min_confidence = min_confidence
+        self.fast_max_words = fast_max_words
+
+    def route(self, message: str) -> TurnRoute:
+        intent, tool_calls, confidence = classify(message)
+        simple = (
+            intent in ("smalltalk", "todo")
+            and tool_calls <= 1
+            and confidence >= self.min_confidence
+            and len(message.split()) <= self.fast_max_words
+        )
+        tier = "fast" if simple and "fast" in self.tiers else STRONG_TIER
+        return TurnRoute(tier, self.tiers[tier]["max_tokens"], intent, tool_calls, confidence)
+
+    def escalate(self, route: TurnRoute) -> TurnRoute:
+        """Return the strong-tier version of ``route``."""
+        return route._replace(tier=STRONG_TIER, max_tokens=self.tiers[STRONG_TIER]["max_tokens"])
+
+
+class TierStats:
+    """Thread-safe per-tier call counts, latency and escalation rate."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, dict] = {}
+
+    def record(self, tier: str, latency_s: float, escalated: bool):
+        """Record one model call; ``escalated`` marks calls retried on the strong tier."""
+        with self._lock:
+            t = self._tiers.setdefault(tier, {"calls": 0, "total_s": 0.0, "max_s": 0.0, "escalations": 0})
+            t["calls"] += 1
+            t["total_s"] += latency_s
+            t["max_s"] = max(t["max_s"], latency_s)
+            t["escalations"] += escalated
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                tier: {
+                    "calls": t["calls"],
+                    "avg_latency_ms": round(t["total_s"] / t["calls"] * 1000, 1),
+                    "max_latency_ms": round(t["max_s"] * 1000, 1),
+                    "escalation_rate": round(t["escalations"] / t["calls"], 3),
+                }
+                for tier, t in self._tiers.items()
+            }
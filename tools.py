@@ -1,135 +1,372 @@
 import json
 import os
-from typing import List
-from langchain.tools import Tool
-from langchain.pydantic_v1 import BaseModel, Field
-from config import TODOS_FILE
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from events import ChangeEvent, bus_for
+from locks import file_lock
+from config import TODOS_FILE, TODOS_DIR, DEFAULT_USER, DEFAULT_LIST, TODO_SHARD_CACHE_SIZE
 
 # Ensure data directory exists
-os.makedirs(os.path.dirname(TODOS_FILE), exist_ok=True)
+os.makedirs(TODOS_DIR, exist_ok=True)
 
-class TodoInput(BaseModel):
-    task: str = Field(description="The task to add to the to-do list")
+def shard_name(name: str) -> str:
+    """Normalize a user or list name into a safe shard file name"""
+    return re.sub(r"[^a-z0-9_-]+", "-", name.strip().lower()).strip("-") or DEFAULT_LIST
 
-class TodoRemoveInput(BaseModel):
-    task_or_index: str = Field(description="Task name or index number to remove")
+class TodoStore:
+    """Todo lists sharded into one JSON file per (user, list).
 
-def load_todos() -> List[str]:
-    """Load todos from file"""
+    Shards are loaded lazily and kept in a small LRU cache that is revalidated
+    against the file's mtime, so an operation only reads or writes the one
+    shard it touches. Every save publishes a "todos" change event; events
+    from other stores (including other processes) update cached shards in
+    place so they don't have to be re-read. Read-modify-write sequences run
+    under ``locked``, which serializes them per shard across threads and
+    processes.
+    """
+
+    def __init__(self, root: str = TODOS_DIR, max_cached: int = TODO_SHARD_CACHE_SIZE):
+        self.root = root
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shard_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.disk_reads = 0
+        self.bus = bus_for(os.path.dirname(os.path.abspath(root)))
+        self.bus.subscribe("todos", self._on_change)
+
+    def path(self, user: str, list_name: str) -> str:
+        return os.path.join(self.root, shard_name(user), f"{shard_name(list_name)}.json")
+
+    @contextmanager
+    def locked(self, user: str, list_name: str):
+        """Hold one shard exclusively for a load/modify/save sequence"""
+        key = (shard_name(user), shard_name(list_name))
+        with self._lock:
+            shard_lock = self._shard_locks.setdefault(key, threading.Lock())
+        with shard_lock, file_lock(self.path(user, list_name)):
+            yield
+
+    def _remember(self, key, stamp, todos: List[str]):
+        with self._lock:
+            self._cache[key] = (stamp, todos)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def load(self, user: str, list_name: str) -> List[str]:
+        """Load one list; served from cache unless the shard changed on disk"""
+        key = (shard_name(user), shard_name(list_name))
+        path = self.path(user, list_name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return []
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == stamp:
+                self._cache.move_to_end(key)
+                return list(cached[1])
+        try:
+            with open(path, "r") as f:
+                todos = json.load(f).get("todos", [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        self.disk_reads += 1
+        self._remember(key, stamp, todos)
+        return list(todos)
+
+    def save(self, user: str, list_name: str, todos: List[str], change: Optional[dict] = None) -> None:
+        """Atomically rewrite one shard and publish the change (``change`` describes the operation)"""
+        path = self.path(user, list_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"todos": todos}, f, indent=2)
+        os.replace(tmp_path, path)
+        st = os.stat(path)
+        key = (shard_name(user), shard_name(list_name))
+        stamp = (st.st_mtime_ns, st.st_size)
+        self._remember(key, stamp, list(todos))
+        delta = dict(change or {"op": "replace"}, todos=todos, stamp=list(stamp), root=os.path.abspath(self.root))
+        self.bus.publish("todos", "/".join(key), st.st_mtime_ns, delta)
+
+    def _on_change(self, event: ChangeEvent):
+        """Apply another store's write to our cached copy of the shard"""
+        if event.delta.get("root") != os.path.abspath(self.root):
+            return
+        key = tuple(event.key.split("/", 1))
+        stamp = tuple(event.delta["stamp"])
+        with self._lock:
+            cached = self._cache.get(key)
+            # Only refresh shards we hold, and never move a shard backwards
+            if cached is None or cached[0] >= stamp:
+                return
+            self._cache[key] = (stamp, list(event.delta["todos"]))
+
+    def lists(self, user: str) -> List[str]:
+        """Names of the lists that exist for a user"""
+        try:
+            names = os.listdir(os.path.join(self.root, shard_name(user)))
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-len(".json")] for n in names if n.endswith(".json"))
+
+def migrate_legacy_todos(store: TodoStore, legacy_file: str = TODOS_FILE) -> int:
+    """Split the old single todos file into shards of the default user.
+
+    ``"todos"`` becomes the default list; any other top-level key holding a
+    list becomes a list of that name. Runs once (guarded by a marker file)
+    and leaves the legacy file in place. Returns the number of lists written.
+    """
+    marker = os.path.join(store.root, ".migrated")
+    if os.path.exists(marker):
+        return 0
+    written = 0
     try:
-        with open(TODOS_FILE, "r") as f:
-            return json.load(f).get("todos", [])
+        with open(legacy_file, "r") as f:
+            data = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
-        return []
+        data = {}
+    for key, todos in data.items():
+        if not isinstance(todos, list):
+            continue
+        list_name = DEFAULT_LIST if key == "todos" else key
+        with store.locked(DEFAULT_USER, list_name):
+            existing = store.load(DEFAULT_USER, list_name)
+            merged = existing + [t for t in todos if t not in existing]
+            if merged != existing:
+                store.save(DEFAULT_USER, list_name, merged)
+                written += 1
+    os.makedirs(store.root, exist_ok=True)
+    with open(marker, "w") as f:
+        f.write(legacy_file)
+    return written
+
+_default_store: Optional[TodoStore] = None
+_default_store_lock = threading.Lock()
+
+def default_store() -> TodoStore:
+    """Shared store for the configured data directory, migrated on first use"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            store = TodoStore()
+            migrate_legacy_todos(store)
+            _default_store = store
+        return _default_store
+
+class TodoSession:
+    """Todo operations for one user namespace on its currently selected list"""
+
+    def __init__(self, user: str = DEFAULT_USER, store: Optional[TodoStore] = None):
+        self.user = user
+        self.store = store if store is not None else default_store()
+        self.active_list = DEFAULT_LIST
+        self.writes = 0  # saves made through this session
+        self.token = uuid.uuid4().hex[:12]  # tags this session's change events
+
+    def _label(self) -> str:
+        return "to-do list" if self.active_list == DEFAULT_LIST else f"'{self.active_list}' list"
+
+    def shard_key(self) -> str:
+        """Event key of the active list, as published by ``TodoStore.save``"""
+        return f"{shard_name(self.user)}/{shard_name(self.active_list)}"
+
+    def load_todos(self) -> List[str]:
+        """Load todos of the active list"""
+        return self.store.load(self.user, self.active_list)
+
+    def save_todos(self, todos: List[str], change: Optional[dict] = None) -> None:
+        """Save todos of the active list"""
+        self.store.save(self.user, self.active_list, todos, dict(change or {"op": "replace"}, session=self.token))
+        self.writes += 1
+
+    def add_todo(self, task: str) -> str:
+        """Add a new task to the to-do list"""
+        task = task.strip()
+        if not task:
+            return "Please provide a task to add."
+        
+        with self.store.locked(self.user, self.active_list):
+            todos = self.load_todos()
+        
+            # Check for duplicates (case-insensitive)
+            for existing_task in todos:
+                if existing_task.lower() == task.lower():
+                    return f"Task '{task}' already exists in your {self._label()}."
+        
+            todos.append(task)
+            self.save_todos(todos, {"op": "add", "task": task})
+            return f"✅ Added '{task}' to your {self._label()}."
+
+    def list_todos(self, _: str = "") -> str:
+        """List all tasks in the to-do list"""
+        todos = self.load_todos()
+        if not todos:
+            return f"📝 Your {self._label()} is empty."
+        
+        todo_list = "\n".join(f"{i+1}. {task}" for i, task in enumerate(todos))
+        heading = "current to-dos" if self.active_list == DEFAULT_LIST else f"'{self.active_list}' to-dos"
+        return f"📋 Here are your {heading}:\n{todo_list}"
+
+    def remove_todo(self, task_or_index: str) -> str:
+        """Remove a task from the to-do list by name or index"""
+        with self.store.locked(self.user, self.active_list):
+            todos = self.load_todos()
+            if not todos:
+                return f"📝 Your {self._label()} is empty."
+
+            task_or_index = task_or_index.strip()
+        
+            # Try by index first
+            try:
+                index = int(task_or_index) - 1
+                if 0 <= index < len(todos):
+                    removed_task = todos.pop(index)
+                    self.save_todos(todos, {"op": "remove", "task": removed_task})
+                    return f"✅ Removed '{removed_task}' from your {self._label()}."
+                else:
+                    return f"❌ Index {task_or_index} is out of range. You have {len(todos)} tasks."
+            except ValueError:
+                pass
+
+            # Try by exact name match first
+            for i, task in enumerate(todos):
+                if task.lower() == task_or_index.lower():
+                    removed_task = todos.pop(i)
+                    self.save_todos(todos, {"op": "remove", "task": removed_task})
+                    return f"✅ Removed '{removed_task}' from your {self._label()}."
+        
+            # Try by partial name match
+            matches = []
+            for i, task in enumerate(todos):
+                if task_or_index.lower() in task.lower():
+                    matches.append((i, task))
+        
+            if len(matches) == 1:
+                i, task = matches[0]
+                removed_task = todos.pop(i)
+                self.save_todos(todos, {"op": "remove", "task": removed_task})
+                return f"✅ Removed '{removed_task}' from your {self._label()}."
+            elif len(matches) > 1:
+                match_list = "\n".join(f"{i+1}. {task}" for i, task in matches)
+                return f"❌ Multiple tasks match '{task_or_index}':\n{match_list}\nPlease be more specific."
+        
+            return f"❌ Task '{task_or_index}' not found in your {self._label()}."
+
+    def clear_todos(self, _: str = "") -> str:
+        """Clear all tasks from the to-do list"""
+        with self.store.locked(self.user, self.active_list):
+            todos = self.load_todos()
+            if not todos:
+                return f"📝 Your {self._label()} is already empty."
+        
+            self.save_todos([], {"op": "clear"})
+            return f"🗑️ Cleared all tasks from your {self._label()}."
+
+    def show_lists(self, _: str = "") -> str:
+        """List the user's to-do lists and mark the active one"""
+        names = self.store.lists(self.user)
+        if self.active_list not in names:
+            names.append(self.active_list)
+        lines = "\n".join(f"{'👉' if n == self.active_list else '•'} {n}" for n in sorted(names))
+        return f"🗂️ Your lists:\n{lines}"
+
+    def switch_list(self, list_name: str) -> str:
+        """Make another list active, creating it on first use"""
+        if not list_name.strip():
+            return "Please provide a list name."
+        self.active_list = shard_name(list_name)
+        count = len(self.load_todos())
+        return f"🗂️ Switched to your {self._label()} ({count} tasks)."
+
+_default_session: Optional[TodoSession] = None
+_default_session_lock = threading.Lock()
+
+def default_session() -> TodoSession:
+    """Session for the default user, shared by the module-level helpers"""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = TodoSession()
+        return _default_session
+
+def load_todos() -> List[str]:
+    """Load todos of the default user's active list"""
+    return default_session().load_todos()
 
 def save_todos(todos: List[str]) -> None:
-    """Save todos to file"""
-    os.makedirs(os.path.dirname(TODOS_FILE), exist_ok=True)
-    with open(TODOS_FILE, "w") as f:
-        json.dump({"todos": todos}, f, indent=2)
+    """Save todos of the default user's active list"""
+    default_session().save_todos(todos)
 
 def add_todo(task: str) -> str:
-    """Add a new task to the to-do list"""
-    task = task.strip()
-    if not task:
-        return "Please provide a task to add."
-    
-    todos = load_todos()
-    
-    # Check for duplicates (case-insensitive)
-    for existing_task in todos:
-        if existing_task.lower() == task.lower():
-            return f"Task '{task}' already exists in your to-do list."
-    
-    todos.append(task)
-    save_todos(todos)
-    return f"✅ Added '{task}' to your to-do list."
+    return default_session().add_todo(task)
 
 def list_todos(_: str = "") -> str:
-    """List all tasks in the to-do list"""
-    todos = load_todos()
-    if not todos:
-        return "📝 Your to-do list is empty."
-    
-    todo_list = "\n".join(f"{i+1}. {task}" for i, task in enumerate(todos))
-    return f"📋 Here are your current to-dos:\n{todo_list}"
+    return default_session().list_todos()
 
 def remove_todo(task_or_index: str) -> str:
-    """Remove a task from the to-do list by name or index"""
-    todos = load_todos()
-    if not todos:
-        return "📝 Your to-do list is empty."
-
-    task_or_index = task_or_index.strip()
-    
-    # Try by index first
-    try:
-        index = int(task_or_index) - 1
-        if 0 <= index < len(todos):
-            removed_task = todos.pop(index)
-            save_todos(todos)
-            return f"✅ Removed '{removed_task}' from your to-do list."
-        else:
-            return f"❌ Index {task_or_index} is out of range. You have {len(todos)} tasks."
-    except ValueError:
-        pass
-
-    # Try by exact name match first
-    for i, task in enumerate(todos):
-        if task.lower() == task_or_index.lower():
-            removed_task = todos.pop(i)
-            save_todos(todos)
-            return f"✅ Removed '{removed_task}' from your to-do list."
-    
-    # Try by partial name match
-    matches = []
-    for i, task in enumerate(todos):
-        if task_or_index.lower() in task.lower():
-            matches.append((i, task))
-    
-    if len(matches) == 1:
-        i, task = matches[0]
-        removed_task = todos.pop(i)
-        save_todos(todos)
-        return f"✅ Removed '{removed_task}' from your to-do list."
-    elif len(matches) > 1:
-        match_list = "\n".join(f"{i+1}. {task}" for i, task in matches)
-        return f"❌ Multiple tasks match '{task_or_index}':\n{match_list}\nPlease be more specific."
-    
-    return f"❌ Task '{task_or_index}' not found in your to-do list."
+    return default_session().remove_todo(task_or_index)
 
 def clear_todos(_: str = "") -> str:
-    """Clear all tasks from the to-do list"""
-    todos = load_todos()
-    if not todos:
-        return "📝 Your to-do list is already empty."
-    
-    save_todos([])
-    return "🗑️ Cleared all tasks from your to-do list."
-
-def create_todo_tools() -> List[Tool]:
-    """Create and return all todo management tools"""
+    return default_session().clear_todos()
+
+def create_todo_tools(session: Optional[TodoSession] = None) -> list:
+    """Create and return all todo management tools bound to ``session``"""
+    # LangChain and pydantic are imported here rather than at module level so
+    # the plain todo functions above stay cheap to import (CLI fast paths).
+    from langchain.tools import Tool
+    from langchain.pydantic_v1 import BaseModel, Field
+
+    session = session if session is not None else default_session()
+
+    class TodoInput(BaseModel):
+        task: str = Field(description="The task to add to the to-do list")
+
+    class TodoRemoveInput(BaseModel):
+        task_or_index: str = Field(description="Task name or index number to remove")
+
+    class ListNameInput(BaseModel):
+        list_name: str = Field(description="Name of the to-do list to switch to, e.g. 'work' or 'groceries'")
+
     return [
         Tool(
             name="add_todo",
-            func=add_todo,
-            description="Add a new task to the user's to-do list. Input should be the task description.",
+            func=session.add_todo,
+            description="Add a new task to the user's active to-do list. Input should be the task description.",
             args_schema=TodoInput
         ),
         Tool(
             name="list_todos",
-            func=list_todos,
-            description="Display all tasks in the user's to-do list. No input required."
+            func=session.list_todos,
+            description="Display all tasks in the user's active to-do list. No input required."
         ),
         Tool(
             name="remove_todo",
-            func=remove_todo,
-            description="Remove a task from the user's to-do list. Input can be the task name or index number.",
+            func=session.remove_todo,
+            description="Remove a task from the user's active to-do list. Input can be the task name or index number.",
             args_schema=TodoRemoveInput
         ),
         Tool(
             name="clear_todos",
-            func=clear_todos,
-            description="Remove all tasks from the user's to-do list. No input required."
+            func=session.clear_todos,
+            description="Remove all tasks from the user's active to-do list. No input required."
+        ),
+        Tool(
+            name="show_lists",
+            func=session.show_lists,
+            description="Show the names of all the user's to-do lists and which one is active. No input required."
+        ),
+        Tool(
+            name="switch_list",
+            func=session.switch_list,
+            description="Switch the active to-do list (creating it if new). Input is the list name.",
+            args_schema=ListNameInput
         )
     ]
@@ -1,8 +1,23 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from agent import TodoAgent
-from tools import load_todos
 import traceback
 
+
+class TodoChangeWatcher:
+    """Count changes other sessions make to the list this session is showing."""
+
+    def __init__(self, todo_session):
+        self.todo_session = todo_session
+        self.changes = 0
+        # Held weakly by the bus; st.session_state keeps the watcher alive
+        todo_session.store.bus.subscribe("todos", self.on_change)
+
+    def on_change(self, event):
+        if (event.key == self.todo_session.shard_key()
+                and event.delta.get("session") != self.todo_session.token):
+            self.changes += 1
+
 # Page settings
 st.set_page_config(
     page_title="TodoBot", 
@@ -72,7 +87,8 @@ debug_mode = st.sidebar.checkbox("🐛 Debug Mode", value=False)
 if "agent" not in st.session_state:
     try:
         with st.spinner("Initializing TodoBot..."):
-            st.session_state.agent = TodoAgent()
+            st.session_state.agent = TodoAgent(session_id=get_script_run_ctx().session_id)
+        st.session_state.todo_watcher = TodoChangeWatcher(st.session_state.agent.todos)
         st.success("✅ TodoBot is ready!")
     except Exception as e:
         st.error(f"❌ Failed to initialize TodoBot: {e}")
@@ -155,7 +171,15 @@ with st.sidebar:
         st.session_state.todo_refresh = 0
     
     try:
-        todos = load_todos()
+        todo_session = st.session_state.agent.todos
+        todos = todo_session.load_todos()
+        st.caption(f"List: {todo_session.active_list}")
+        # The store's cache is kept current by change events from other sessions;
+        # their changes show up on the next rerun or Refresh click
+        remote_changes = st.session_state.todo_watcher.changes
+        if remote_changes != st.session_state.get('seen_todo_changes', remote_changes):
+            st.caption("🔔 Updated by another session")
+        st.session_state.seen_todo_changes = remote_changes
         if todos:
             st.write(f"**Total: {len(todos)} items**")
             for i, todo in enumerate(todos, 1):
@@ -259,6 +283,10 @@ if debug_mode:
     st.sidebar.header("🐛 Debug Info")
     st.sidebar.write(f"Messages count: {len(st.session_state.messages)}")
     st.sidebar.write(f"Todo refresh count: {st.session_state.get('todo_refresh', 0)}")
+    st.sidebar.write("Model tiers:", st.session_state.agent.get_routing_stats())
+    st.sidebar.write("Admission:", st.session_state.agent.get_admission_metrics())
+    bus = st.session_state.agent.todos.store.bus
+    st.sidebar.write(f"Change events: {bus.published} published, {bus.received_remote} from other processes")
     
     if st.sidebar.button("Show Agent State"):
         try: